@@ -11,10 +11,123 @@ Date: 2025-11-11
 
 from nba_api.stats.static import players, teams
 from nba_api.stats.endpoints import playergamelog, commonplayerinfo
-
+from nba_api.stats.library.http import NBAStatsHTTP
+
+import json
+import os
+import pickle
+import sys
+import time
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import numpy as np
 import pandas as pd
 import requests
-from datetime import datetime, date, timedelta
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from datetime import date, timedelta
+
+try:  # optional: JIT-compiles the team game-count loop
+    from numba import njit
+except ImportError:
+    njit = None
+
+try:  # optional: faster parsing of the multi-MB schedule JSON
+    import orjson
+except ImportError:
+    orjson = None
+
+# ==========================================================
+# 🔹 CACHING
+# ==========================================================
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "fantasy_bball")
+CACHE_TTL_SECONDS = 24 * 60 * 60  # refresh API data once a day
+
+# Static player list, loaded once instead of on every fuzzy search
+_ALL_PLAYERS = players.get_players()
+
+# (full_name, lowercase name, id) for each player, so searches don't re-lowercase
+_PLAYER_INDEX = [(p["full_name"], p["full_name"].lower(), p["id"]) for p in _ALL_PLAYERS]
+
+# Player ID -> full name, the choices mapping for find_player_rapidfuzz
+_PLAYER_NAMES_BY_ID = {player_id: full_name for full_name, _, player_id in _PLAYER_INDEX}
+
+# Lowercase full name -> players with that exact name, for O(1) exact lookups
+_EXACT_INDEX = {}
+for _full_name, _lower_name, _player_id in _PLAYER_INDEX:
+    _EXACT_INDEX.setdefault(_lower_name, []).append({"name": _full_name, "id": _player_id})
+
+# Exact names that are also the start of a longer name (e.g., "jaren jackson" vs
+# "jaren jackson jr."); these aren't unambiguous, so they skip the fast path
+_SORTED_LOWER_NAMES = sorted(_EXACT_INDEX)
+_PREFIX_NAMES = set()
+for _lower_name in _SORTED_LOWER_NAMES:
+    _next = bisect_left(_SORTED_LOWER_NAMES, _lower_name + " ")
+    if _next < len(_SORTED_LOWER_NAMES) and _SORTED_LOWER_NAMES[_next].startswith(_lower_name + " "):
+        _PREFIX_NAMES.add(_lower_name)
+
+# Team abbreviation (e.g., "LAL") -> team ID, for reading teams off game logs
+_TEAM_ID_BY_ABBR = {t["abbreviation"]: t["id"] for t in teams.get_teams()}
+
+
+def _load_cached(key: str):
+    """
+    Load a pickled value from the disk cache if it exists and is still fresh.
+
+    Args:
+        key (str): Cache entry name (e.g., "gamelog_2544_2025-26").
+
+    Returns:
+        object | None: Cached value, or None if missing/expired/unreadable.
+    """
+    path = os.path.join(CACHE_DIR, f"{key}.pkl")
+    try:
+        if time.time() - os.path.getmtime(path) > CACHE_TTL_SECONDS:
+            return None
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except Exception:
+        # Best-effort: corrupt files or pickles from an older pandas (moved
+        # modules/classes) are treated as a cache miss and refetched
+        return None
+
+
+def _save_cached(key: str, value):
+    """
+    Pickle a value into the disk cache. Failures are ignored (cache is best-effort).
+
+    Args:
+        key (str): Cache entry name.
+        value (object): Value to store.
+    """
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(os.path.join(CACHE_DIR, f"{key}.pkl"), "wb") as f:
+            pickle.dump(value, f)
+    except OSError:
+        pass
+
+# ==========================================================
+# 🔹 HTTP SESSION
+# ==========================================================
+
+MAX_FETCH_WORKERS = 8  # parallel player fetches in process_roster
+HTTP_POOL_SIZE = 16
+HTTP_TIMEOUT = 10  # seconds
+
+# Shared session so the schedule feed and nba_api reuse TCP/TLS connections
+_SESSION = requests.Session()
+# Retry connection errors and 429/5xx responses, but not read timeouts: a hung
+# stats.nba.com request should fail after one timeout, not several
+_RETRY = Retry(total=3, read=0, backoff_factor=0.2,
+               status_forcelist=(429, 500, 502, 503, 504), raise_on_status=False)
+_SESSION.mount("https://", HTTPAdapter(pool_connections=HTTP_POOL_SIZE,
+                                       pool_maxsize=HTTP_POOL_SIZE,
+                                       max_retries=_RETRY))
+NBAStatsHTTP.set_session(_SESSION)
 
 # ==========================================================
 # 🔹 PLAYER & TEAM LOOKUP HELPERS
@@ -30,20 +143,14 @@ def find_player_id(player_name: str):
     Returns:
         int | None: Player ID if found, otherwise None.
     """
-
-    player_data = players.find_players_by_full_name(player_name)
-    if not player_data:
-        return None
-
-    for p in player_data:
-        if p["full_name"].lower() == player_name.lower():
-            return p["id"]  # return ID immediately if match found
-
-    return None  # no match found
+    matches = _EXACT_INDEX.get(player_name.lower())
+    return matches[0]["id"] if matches else None
 
 def find_player_fuzzy(input_name: str):
     """
     Return a list of possible players matching part of a name (case-insensitive).
+    An exact full-name match returns only that player, unless the name is also
+    the start of another player's name (e.g., "Jaren Jackson" / "Jaren Jackson Jr.").
 
     Args:
         input_name (str): Partial or full name to search.
@@ -52,12 +159,35 @@ def find_player_fuzzy(input_name: str):
         list[dict]: List of matching player dicts, each containing:
             {"name": full name, "id": player ID}.
     """
-    candidates = []
     input_lower = input_name.lower()
-    for p in players.get_players():
-        if input_lower in p["full_name"].lower():
-            candidates.append({"name": p["full_name"], "id": p["id"]})
-    return candidates
+
+    # Fast path: a complete, unambiguous name skips the full scan
+    exact = _EXACT_INDEX.get(input_lower)
+    if exact and input_lower not in _PREFIX_NAMES:
+        return list(exact)
+
+    return [{"name": full_name, "id": player_id}
+            for full_name, lower_name, player_id in _PLAYER_INDEX
+            if input_lower in lower_name]
+
+def find_player_rapidfuzz(input_name: str, limit: int = 10):
+    """
+    Return the closest player names by fuzzy similarity (handles typos).
+    Requires the optional `rapidfuzz` package.
+
+    Args:
+        input_name (str): Partial, full, or misspelled name to search.
+        limit (int): Maximum number of matches to return.
+
+    Returns:
+        list[dict]: Best matches first, each containing:
+            {"name": full name, "id": player ID}.
+    """
+    from rapidfuzz import process, fuzz, utils
+
+    matches = process.extract(input_name, _PLAYER_NAMES_BY_ID, scorer=fuzz.WRatio,
+                              processor=utils.default_process, limit=limit)
+    return [{"name": full_name, "id": player_id} for full_name, _, player_id in matches]
 
 # Ask user to pick the correct player if multiple candidates exist
 def choose_player(candidates):
@@ -87,9 +217,11 @@ def choose_player(candidates):
                 return candidates[idx]
         print("Invalid choice. Try again.")
 
+@lru_cache(maxsize=None)
 def get_player_team_id(player_id: int):
     """
     Retrieve a player's current team ID.
+    Cached in memory and on disk (24h) to avoid repeated API calls.
 
     Args:
         player_id (int): NBA player ID.
@@ -97,9 +229,31 @@ def get_player_team_id(player_id: int):
     Returns:
         int: Team ID.
     """
+    key = f"team_{player_id}"
+    team_id = _load_cached(key)
+    if team_id is not None:
+        return team_id
+
     info = commonplayerinfo.CommonPlayerInfo(player_id=player_id)
     df = info.get_data_frames()[0]
-    return int(df.loc[0, "TEAM_ID"])
+    team_id = int(df.loc[0, "TEAM_ID"])
+    _save_cached(key, team_id)
+    return team_id
+
+def team_id_from_gamelog(df: pd.DataFrame):
+    """
+    Read a player's current team ID from their most recent game, avoiding an API call.
+
+    Args:
+        df (pd.DataFrame): Player's game log (newest game first).
+
+    Returns:
+        int | None: Team ID, or None if the log is empty or the team is unknown.
+    """
+    if df.empty:
+        return None
+    abbreviation = df["MATCHUP"].iat[0].split()[0]  # "LAL vs. BOS" / "LAL @ BOS"
+    return _TEAM_ID_BY_ABBR.get(abbreviation)
 
 # ==========================================================
 # 🔹 STATS FETCHING & AVERAGE CALCULATIONS
@@ -110,20 +264,22 @@ def print_stats(title: str, stats: dict, extra_info: str = None):
     Print any stats dictionary in a formatted table.
     Percentages are handled automatically.
     """
-    print(f"\n{title}\n")
+    # Build the whole table and write it once instead of one print per line
+    lines = [f"\n{title}\n"]
     if extra_info:
-        print(extra_info + "\n")
-    for stat, val in stats.items():
-        if "PCT" in stat:
-            print(f"{stat:<8}: {val:.1f}%")
-        else:
-            print(f"{stat:<8}: {val:.2f}")
-    print("\n" + "-"*40 + "\n")
+        lines.append(extra_info + "\n")
+    lines.extend(f"{stat:<8}: {val:.1f}%" if "PCT" in stat else f"{stat:<8}: {val:.2f}"
+                 for stat, val in stats.items())
+    lines.append("\n" + "-" * 40 + "\n")
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
+@lru_cache(maxsize=None)
 def get_player_gamelog(player_id: int, season: str = "2025-26") -> pd.DataFrame:
     """
     Fetch a player's full game log for a season.
+    Cached in memory and on disk (24h) to avoid repeated API calls.
+    The returned DataFrame is shared between callers, so don't modify it.
 
     Args:
         player_id (int): NBA player ID.
@@ -132,76 +288,299 @@ def get_player_gamelog(player_id: int, season: str = "2025-26") -> pd.DataFrame:
     Returns:
         pd.DataFrame: Game-by-game stats for that season.
     """
+    key = f"gamelog_{player_id}_{season}"
+    df = _load_cached(key)
+    if df is not None:
+        return df
+
     game_log = playergamelog.PlayerGameLog(player_id=player_id, season=season)
-    return game_log.get_data_frames()[0]
+    df = game_log.get_data_frames()[0]
+    _save_cached(key, df)
+    return df
 
 
-def calculate_accurate_averages(df: pd.DataFrame) -> dict:
+# Counting stats averaged per game, in display order
+_STAT_COLS = ["PTS", "REB", "AST", "STL", "BLK", "TOV", "FG3M", "FGA", "FGM", "FTA", "FTM"]
+_FGA, _FGM, _FTA, _FTM = (_STAT_COLS.index(c) for c in ("FGA", "FGM", "FTA", "FTM"))
+
+
+def stats_to_dict(stats: tuple) -> dict:
+    """
+    Convert a (counting stats array, FG%, FT%) tuple into a stat-name dictionary.
+    Used at the display/comparison boundary; calculations stay on arrays.
+
+    Args:
+        stats (tuple): (np.ndarray ordered like _STAT_COLS, FG%, FT%).
+
+    Returns:
+        dict: Stat name -> value, including FG_PCT and FT_PCT.
+    """
+    counts, fg_pct, ft_pct = stats
+    result = dict(zip(_STAT_COLS, counts.tolist()))
+    result["FG_PCT"] = fg_pct
+    result["FT_PCT"] = ft_pct
+    return result
+
+
+# Player averages, keyed by the cache_key passed to calculate_accurate_averages
+_AVERAGES_CACHE = {}
+
+
+def calculate_accurate_averages(df: pd.DataFrame, cache_key=None) -> tuple:
     """
     Calculate per-game averages and accurate FG%/FT% from a player's game log.
+    The returned array is shared between callers and is read-only.
 
     Args:
         df (pd.DataFrame): Player's game log dataframe.
+        cache_key (hashable, optional): Identifies this game log (e.g.,
+            (player_id, games played, latest Game_ID)) so repeat calls reuse the result.
 
     Returns:
-        dict: Average stats and shooting percentages.
-    """
-    total_fgm, total_fga = df["FGM"].sum(), df["FGA"].sum()
-    total_ftm, total_fta = df["FTM"].sum(), df["FTA"].sum()
-
-    fg_pct = (total_fgm / total_fga * 100) if total_fga > 0 else 0
-    ft_pct = (total_ftm / total_fta * 100) if total_fta > 0 else 0
-
-    averages = {
-        "PTS": df["PTS"].mean(),
-        "REB": df["REB"].mean(),
-        "AST": df["AST"].mean(),
-        "STL": df["STL"].mean(),
-        "BLK": df["BLK"].mean(),
-        "TOV": df["TOV"].mean(),
-        "FG3M": df["FG3M"].mean(),
-        "FGA": df["FGA"].mean(),   # <-- add this
-        "FGM": df["FGM"].mean(),   # <-- add this
-        "FTA": df["FTA"].mean(),   # <-- add this
-        "FTM": df["FTM"].mean(),   # <-- add this
-        "FG_PCT": fg_pct,
-        "FT_PCT": ft_pct,
-    }
+        tuple: (per-game averages array ordered like _STAT_COLS, FG%, FT%).
+    """
+    if cache_key is not None and cache_key in _AVERAGES_CACHE:
+        return _AVERAGES_CACHE[cache_key]
+
+    # One NumPy reduction over all stat columns instead of a pandas call per column
+    arr = df[_STAT_COLS].to_numpy(dtype=np.float64, copy=False)
+    means = arr.mean(axis=0)
+    means.setflags(write=False)
+    sums = arr.sum(axis=0)
+
+    total_fgm, total_fga = sums[_FGM], sums[_FGA]
+    total_ftm, total_fta = sums[_FTM], sums[_FTA]
 
+    fg_pct = float(total_fgm / total_fga * 100) if total_fga > 0 else 0.0
+    ft_pct = float(total_ftm / total_fta * 100) if total_fta > 0 else 0.0
+
+    averages = (means, fg_pct, ft_pct)
+
+    if cache_key is not None:
+        _AVERAGES_CACHE[cache_key] = averages
     return averages
 
-def display_player_averages(player_name: str, averages: dict, season: str):
+def display_player_averages(player_name: str, averages: tuple, season: str):
     """
     Display a formatted summary of a player's season averages.
 
     Args:
         player_name (str): Full player name.
-        averages (dict): Player averages dictionary.
+        averages (tuple): Output of calculate_accurate_averages().
         season (str): Season string.
     """
-    print(f"\n📊 {player_name} - {season} Season Averages:\n")
-    for stat, val in averages.items():
-        if "PCT" in stat:
-            print(f"{stat:<8}: {val:.1f}%")
-        else:
-            print(f"{stat:<8}: {val:.2f}")
-    print("\n" + "-" * 40 + "\n")
+    print_stats(f"📊 {player_name} - {season} Season Averages:", stats_to_dict(averages))
 
 # ==========================================================
 # 🔹 SCHEDULE UTILITIES
 # ==========================================================
 
+SCHEDULE_URL = "https://cdn.nba.com/static/json/staticData/scheduleLeagueV2_1.json"
+SCHEDULE_CACHE_PATH = os.path.join(CACHE_DIR, "schedule.json")
+SCHEDULE_ETAG_PATH = os.path.join(CACHE_DIR, "schedule.etag")
+
+# Parsed schedule, kept for the lifetime of the process
+_SCHEDULE = None
+
+
+def _parse_json(raw: bytes):
+    """
+    Parse JSON bytes, using orjson when installed and the stdlib otherwise.
+    """
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+
 def load_full_schedule():
     """
     Load the full NBA schedule from the official JSON feed.
+    The feed is cached on disk and revalidated with its ETag, so an unchanged
+    schedule costs a 304 response instead of a full download.
 
     Returns:
         dict: Complete NBA schedule data.
     """
-    url = "https://cdn.nba.com/static/json/staticData/scheduleLeagueV2_1.json"
-    resp = requests.get(url)
+    global _SCHEDULE
+    if _SCHEDULE is not None:
+        return _SCHEDULE
+
+    headers = {}
+    try:
+        with open(SCHEDULE_ETAG_PATH) as f:
+            if os.path.exists(SCHEDULE_CACHE_PATH):
+                headers["If-None-Match"] = f.read().strip()
+    except OSError:
+        pass
+
+    resp = _SESSION.get(SCHEDULE_URL, headers=headers, timeout=HTTP_TIMEOUT)
+    if resp.status_code == 304:
+        try:
+            with open(SCHEDULE_CACHE_PATH, "rb") as f:
+                _SCHEDULE = _parse_json(f.read())
+            return _SCHEDULE
+        except (OSError, ValueError):
+            # Cached copy is unusable; download the full feed instead
+            resp = _SESSION.get(SCHEDULE_URL, timeout=HTTP_TIMEOUT)
+
     resp.raise_for_status()
-    return resp.json()
+    _SCHEDULE = _parse_json(resp.content)
+
+    # Drop the old ETag before replacing the body, so the saved tag can never
+    # describe a different schedule.json than the one on disk
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        if os.path.exists(SCHEDULE_ETAG_PATH):
+            os.remove(SCHEDULE_ETAG_PATH)
+        with open(SCHEDULE_CACHE_PATH + ".tmp", "wb") as f:
+            f.write(resp.content)
+        os.replace(SCHEDULE_CACHE_PATH + ".tmp", SCHEDULE_CACHE_PATH)
+        etag = resp.headers.get("ETag")
+        if etag:
+            with open(SCHEDULE_ETAG_PATH, "w") as f:
+                f.write(etag)
+    except OSError:
+        pass
+
+    return _SCHEDULE
+
+# (schedule, compiled arrays, team indices), keyed by id(schedule). Only the most
+# recently compiled schedule is kept; compiling a new one clears both schedule caches.
+_COMPILED_SCHEDULE_CACHE = {}
+
+# (schedule, per-team game counts), keyed by (id(schedule), start_date, end_date).
+# The schedule is kept in the value so a reused id() can't return stale counts.
+_TEAM_GAME_COUNTS_CACHE = {}
+
+
+def _compile_schedule_cached(schedule: dict):
+    """
+    Build (or fetch from cache) the compiled arrays and team indices for a schedule.
+
+    Args:
+        schedule (dict): Preloaded NBA schedule data.
+
+    Returns:
+        tuple: (compile_schedule() result, _index_schedule_teams() result).
+    """
+    key = id(schedule)
+    cached = _COMPILED_SCHEDULE_CACHE.get(key)
+    if cached is not None and cached[0] is schedule:
+        return cached[1], cached[2]
+
+    dates, home, away = [], [], []
+    for date_entry in schedule["leagueSchedule"]["gameDates"]:
+        s = date_entry["gameDate"]  # fixed format "MM/DD/YYYY HH:MM:SS"
+        ordinal = date(int(s[6:10]), int(s[0:2]), int(s[3:5])).toordinal()
+        for game in date_entry["games"]:
+            dates.append(ordinal)
+            home.append(int(game["homeTeam"]["teamId"]))
+            away.append(int(game["awayTeam"]["teamId"]))
+
+    dates = np.array(dates, dtype=np.int32)
+    order = np.argsort(dates, kind="stable")  # feed is already ~sorted; make it exact
+    home = np.array(home, dtype=np.int32)[order]
+    away = np.array(away, dtype=np.int32)[order]
+    compiled = (dates[order], home, away)
+
+    # Remap team IDs to dense indices 0..n_teams-1
+    team_ids, inverse = np.unique(np.concatenate([home, away]), return_inverse=True)
+    inverse = inverse.astype(np.int32)
+    indexed = (team_ids, inverse[:len(home)], inverse[len(home):])
+
+    # Drop data derived from any previous schedule so old schedules can be freed
+    _COMPILED_SCHEDULE_CACHE.clear()
+    _TEAM_GAME_COUNTS_CACHE.clear()
+    _COMPILED_SCHEDULE_CACHE[key] = (schedule, compiled, indexed)
+    return compiled, indexed
+
+def compile_schedule(schedule: dict):
+    """
+    Flatten the nested schedule JSON into parallel NumPy arrays (one entry per game).
+    Results are cached for the most recently compiled schedule.
+
+    Args:
+        schedule (dict): Preloaded NBA schedule data.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: (game date ordinals, home team IDs,
+            away team IDs), all int32 and sorted by date.
+    """
+    return _compile_schedule_cached(schedule)[0]
+
+def _index_schedule_teams(schedule: dict):
+    """
+    Remap the compiled schedule's team IDs to dense indices 0..n_teams-1.
+    Computed and cached together with compile_schedule().
+
+    Args:
+        schedule (dict): Preloaded NBA schedule data.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: (sorted unique team IDs,
+            home team indices, away team indices).
+    """
+    return _compile_schedule_cached(schedule)[1]
+
+def _week_slice(dates: np.ndarray, start_date: date, end_date: date) -> slice:
+    """
+    Binary-search the sorted date array for the games between two dates (inclusive).
+
+    Args:
+        dates (np.ndarray): Sorted game date ordinals from compile_schedule().
+        start_date (date): Start of week.
+        end_date (date): End of week.
+
+    Returns:
+        slice: Index range of the games in the week.
+    """
+    lo, hi = np.searchsorted(dates, [start_date.toordinal(), end_date.toordinal() + 1])
+    return slice(int(lo), int(hi))
+
+def _team_game_counts_loop(home_idx, away_idx, n_teams):
+    """
+    Count games per team index with a single loop.
+    Only used when numba is available to compile it.
+    """
+    out = np.zeros(n_teams, np.int32)
+    for i in range(home_idx.shape[0]):
+        out[home_idx[i]] += 1
+        out[away_idx[i]] += 1
+    return out
+
+_team_game_counts_kernel = njit(cache=True)(_team_game_counts_loop) if njit else None
+
+def build_team_game_counts(schedule: dict, start_date: date, end_date: date) -> dict:
+    """
+    Count games for every team between two dates, touching only that week's games.
+    Results are cached per schedule and date range.
+
+    Args:
+        schedule (dict): Preloaded NBA schedule data.
+        start_date (date): Start of week.
+        end_date (date): End of week.
+
+    Returns:
+        dict[int, int]: Team ID -> number of games scheduled.
+    """
+    key = (id(schedule), start_date, end_date)
+    cached = _TEAM_GAME_COUNTS_CACHE.get(key)
+    if cached is not None and cached[0] is schedule:
+        return cached[1]
+
+    dates, _, _ = compile_schedule(schedule)
+    team_ids, home_idx, away_idx = _index_schedule_teams(schedule)
+    week = _week_slice(dates, start_date, end_date)
+    home_idx, away_idx = home_idx[week], away_idx[week]
+
+    if _team_game_counts_kernel is not None:
+        team_counts = _team_game_counts_kernel(home_idx, away_idx, len(team_ids))
+    else:
+        team_counts = np.bincount(np.concatenate([home_idx, away_idx]),
+                                  minlength=len(team_ids))
+    counts = {team_id: count
+              for team_id, count in zip(team_ids.tolist(), team_counts.tolist()) if count}
+
+    _TEAM_GAME_COUNTS_CACHE[key] = (schedule, counts)
+    return counts
 
 def count_team_games_for_week(team_id: int, start_date: date, end_date: date, schedule: dict):
     """
@@ -216,14 +595,9 @@ def count_team_games_for_week(team_id: int, start_date: date, end_date: date, sc
     Returns:
         int: Number of games scheduled.
     """
-    count = 0
-    for date_entry in schedule["leagueSchedule"]["gameDates"]:
-        game_date = datetime.strptime(date_entry["gameDate"], "%m/%d/%Y %H:%M:%S").date()
-        if start_date <= game_date <= end_date:
-            for game in date_entry["games"]:
-                if int(game["homeTeam"]["teamId"]) == team_id or int(game["awayTeam"]["teamId"]) == team_id:
-                    count += 1
-    return count
+    dates, home, away = compile_schedule(schedule)
+    week = _week_slice(dates, start_date, end_date)
+    return int(np.count_nonzero((home[week] == team_id) | (away[week] == team_id)))
 
 
 def get_week_range(option=1):
@@ -256,69 +630,48 @@ def get_week_range(option=1):
 # 🔹 PROJECTIONS & AGGREGATIONS
 # ==========================================================
 
-def project_weekly_totals(averages: dict, num_games: int) -> dict:
+def project_weekly_totals(averages: tuple, num_games: int) -> tuple:
     """
     Project a player's weekly totals by scaling per-game averages.
 
     Args:
-        averages (dict): Player's per-game averages.
+        averages (tuple): Output of calculate_accurate_averages().
         num_games (int): Number of games in the week.
 
     Returns:
-        dict: Projected totals for the week.
+        tuple: (projected totals array, FG%, FT%).
     """
-    projected = {}
+    counts, fg_pct, ft_pct = averages
 
-    # Scale counting stats by number of games
-    for stat, val in averages.items():
-        if stat not in ["FG_PCT", "FT_PCT"]:
-            projected[stat] = val * num_games
+    # Scale counting stats by number of games; percentages don’t scale
+    return counts * num_games, fg_pct, ft_pct
 
-    # Keep percentages the same (they don’t scale)
-    projected["FG_PCT"] = averages.get("FG_PCT", 0)
-    projected["FT_PCT"] = averages.get("FT_PCT", 0)
-
-    return projected
-
-def aggregate_projected_totals(all_projected: list) -> dict:
+def aggregate_projected_totals(all_projected: list) -> tuple:
     """
     Combine multiple players' projected stats into team totals.
 
     FG% and FT% are recalculated from combined FGM/FGA and FTM/FTA.
 
     Args:
-        all_projected (list[dict]): List of player projections.
+        all_projected (list[tuple]): List of player projections.
 
     Returns:
-        dict: Aggregated totals and accurate team shooting percentages.
-    """
-    total = {}
-    total_fgm = total_fga = total_ftm = total_fta = 0
-
-    for proj in all_projected:
-        for stat, val in proj.items():
-            if stat == "FGM":
-                total_fgm += val
-            elif stat == "FGA":
-                total_fga += val
-            elif stat == "FTM":
-                total_ftm += val
-            elif stat == "FTA":
-                total_fta += val
-            elif stat not in ["FG_PCT", "FT_PCT"]:
-                total[stat] = total.get(stat, 0) + val
-
-    # Save raw totals
-    total["FGM"] = total_fgm
-    total["FGA"] = total_fga
-    total["FTM"] = total_ftm
-    total["FTA"] = total_fta
+        tuple: (team totals array, accurate team FG%, accurate team FT%).
+    """
+    if not all_projected:
+        return np.zeros(len(_STAT_COLS)), 0.0, 0.0
+
+    # Sum every counting stat across players in one reduction
+    total = np.sum(np.stack([counts for counts, _, _ in all_projected]), axis=0)
+
+    total_fgm, total_fga = total[_FGM], total[_FGA]
+    total_ftm, total_fta = total[_FTM], total[_FTA]
 
     # Compute accurate team percentages
-    total["FG_PCT"] = (total_fgm / total_fga * 100) if total_fga > 0 else 0
-    total["FT_PCT"] = (total_ftm / total_fta * 100) if total_fta > 0 else 0
+    fg_pct = float(total_fgm / total_fga * 100) if total_fga > 0 else 0.0
+    ft_pct = float(total_ftm / total_fta * 100) if total_fta > 0 else 0.0
 
-    return total
+    return total, fg_pct, ft_pct
 
 # ==========================================================
 # 🔹 ROSTER & TEAM COMPARISON LOGIC
@@ -338,83 +691,136 @@ def input_roster(team_label="Team"):
     return [name.strip() for name in roster_input.split(",")]
 
 
-def display_projected_totals(player_name: str, projected: dict, num_games: int, start: date, end: date):
+def display_projected_totals(player_name: str, projected: tuple, num_games: int, start: date, end: date):
     """
     Display a player's projected totals for the given week.
 
     Args:
         player_name (str): Full player name.
-        projected (dict): Projected weekly totals.
+        projected (tuple): Output of project_weekly_totals().
         num_games (int): Number of games scheduled.
         start (date): Start date of the week.
         end (date): End date of the week.
     """
-    print(f"\n📈 Estimated totals for {player_name} over {num_games} games ({start} to {end}):\n")
-    for stat, val in projected.items():
-        if "PCT" in stat:
-            print(f"{stat:<8}: {val:.1f}%")
-        else:
-            print(f"{stat:<8}: {val:.2f}")
-    print("\n" + "-" * 40 + "\n")
+    print_stats(f"📈 Estimated totals for {player_name} over {num_games} games ({start} to {end}):",
+                stats_to_dict(projected))
 
-def process_roster(player_names, week_option=1, schedule_data=None):
+def resolve_all(player_names):
     """
-    Process and project stats for a list of players over a given week.
-    Optimized: schedule is fetched once and passed in.
+    Resolve each unique player name to a player, prompting the user when needed.
 
     Args:
-        player_names (list[str]): List of player names.
-        week_option (int): 1 = current week, 2 = next week.
-        schedule_data (dict, optional): Preloaded schedule to avoid repeated API calls.
+        player_names (list[str]): Player names (duplicates are resolved once).
 
     Returns:
-        tuple: (all_projected list, aggregated totals dict)
+        dict: Input name -> {"name": full name, "id": player ID}.
     """
-    start, end = get_week_range(week_option)
-    if schedule_data is None:
-        schedule_data = load_full_schedule()  # fetch once
-
-    all_projected = []
-
-    for name in player_names:
+    resolved = {}
+    for name in dict.fromkeys(player_names):  # dedupe, keep order
+        query = name
         selected_player = None
         while not selected_player:
-            print(f"\n🔹 Processing '{name}'...\n")
-            candidates = find_player_fuzzy(name)
+            print(f"\n🔹 Processing '{query}'...\n")
+            candidates = find_player_fuzzy(query)
             if not candidates:
-                name = input(f"❌ No players found for '{name}'. Retype: ").strip()
+                query = input(f"❌ No players found for '{query}'. Retype: ").strip()
                 continue
             selected_player = choose_player(candidates)
+        resolved[name] = selected_player
+    return resolved
 
-        player_id = selected_player["id"]
-        full_name = selected_player["name"]
-        season = "2025-26"
+def fetch_all(player_ids, season: str = "2025-26"):
+    """
+    Fetch game logs and team IDs for each unique player in parallel (network-bound).
+
+    Args:
+        player_ids (Iterable[int]): NBA player IDs (duplicates are fetched once).
+        season (str): Season string, e.g., "2025-26".
+
+    Returns:
+        dict: Player ID -> (game log DataFrame, team ID).
+    """
+    def fetch(player_id):
         df = get_player_gamelog(player_id, season)
+        team_id = team_id_from_gamelog(df)
+        if team_id is None:  # no games yet: ask the API
+            team_id = get_player_team_id(player_id)
+        return df, team_id
+
+    unique_ids = list(dict.fromkeys(player_ids))
+    with ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS) as executor:
+        return dict(zip(unique_ids, executor.map(fetch, unique_ids)))
+
+def project(player_names, resolved, fetched, schedule_data, week_option=1, season: str = "2025-26"):
+    """
+    Project weekly stats for one roster from already resolved and fetched players.
+
+    Args:
+        player_names (list[str]): Roster player names (keys into `resolved`).
+        resolved (dict): Output of resolve_all().
+        fetched (dict): Output of fetch_all().
+        schedule_data (dict): Preloaded NBA schedule data.
+        week_option (int): 1 = current week, 2 = next week.
+        season (str): Season string, e.g., "2025-26".
+
+    Returns:
+        tuple: (all_projected list of projection tuples, aggregated totals dict)
+    """
+    start, end = get_week_range(week_option)
+    team_game_counts = build_team_game_counts(schedule_data, start, end)  # count once
+
+    all_projected = []
+
+    for name in player_names:
+        player_id = resolved[name]["id"]
+        full_name = resolved[name]["name"]
+        df, team_id = fetched[player_id]
 
         if df.empty:
             print(f"⚠️ No game data for {full_name}. Projected stats will be 0.\n")
-            averages = {k: 0 for k in ["PTS","REB","AST","STL","BLK","TOV","FG3M",
-                                        "FGA","FGM","FTA","FTM","FG_PCT","FT_PCT"]}
+            averages = (np.zeros(len(_STAT_COLS)), 0.0, 0.0)
         else:
-            averages = calculate_accurate_averages(df)
+            # Game logs are newest-first, so row 0 is the latest game
+            cache_key = (player_id, len(df), df["Game_ID"].iat[0])
+            averages = calculate_accurate_averages(df, cache_key)
 
-        print_stats(f"📊 {full_name} - {season} Season Averages", averages)
+        print_stats(f"📊 {full_name} - {season} Season Averages", stats_to_dict(averages))
 
-        team_id = get_player_team_id(player_id)
-        games = count_team_games_for_week(team_id, start, end, schedule_data)
+        games = team_game_counts.get(team_id, 0)
         projected = project_weekly_totals(averages, games)
         all_projected.append(projected)
 
-        print_stats(f"📈 {full_name} - Projected totals ({games} games)", projected,
+        print_stats(f"📈 {full_name} - Projected totals ({games} games)", stats_to_dict(projected),
                     f"📅 {full_name}'s team will play {games} games from {start} to {end}")
 
-    aggregated = aggregate_projected_totals(all_projected) if all_projected else {}
+    aggregated = stats_to_dict(aggregate_projected_totals(all_projected)) if all_projected else {}
 
     return all_projected, aggregated
 
+def process_roster(player_names, week_option=1, schedule_data=None):
+    """
+    Process and project stats for a list of players over a given week.
+    Optimized: schedule is fetched once and passed in.
+
+    Args:
+        player_names (list[str]): List of player names.
+        week_option (int): 1 = current week, 2 = next week.
+        schedule_data (dict, optional): Preloaded schedule to avoid repeated API calls.
+
+    Returns:
+        tuple: (all_projected list of projection tuples, aggregated totals dict)
+    """
+    if schedule_data is None:
+        schedule_data = load_full_schedule()  # fetch once
+
+    resolved = resolve_all(player_names)
+    fetched = fetch_all(p["id"] for p in resolved.values())
+    return project(player_names, resolved, fetched, schedule_data, week_option)
+
 def compare_two_teams(team_a_names, team_b_names, week_option=1):
     """
     Compare two fantasy teams' weekly projections category-by-category.
+    Players are resolved and fetched once across both rosters.
 
     Args:
         team_a_names (list[str]): Team A player names.
@@ -424,8 +830,12 @@ def compare_two_teams(team_a_names, team_b_names, week_option=1):
     Returns:
         tuple: (team_a_totals, team_b_totals, overall_winner)
     """
-    _, team_a_totals = process_roster(team_a_names, week_option)
-    _, team_b_totals = process_roster(team_b_names, week_option)
+    schedule_data = load_full_schedule()
+    resolved = resolve_all(team_a_names + team_b_names)
+    fetched = fetch_all(p["id"] for p in resolved.values())
+
+    _, team_a_totals = project(team_a_names, resolved, fetched, schedule_data, week_option)
+    _, team_b_totals = project(team_b_names, resolved, fetched, schedule_data, week_option)
 
     categories = ["PTS","REB","AST","STL","BLK","TOV","FG3M"]
     team_a_score = 0